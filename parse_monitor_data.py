@@ -2,6 +2,11 @@ import struct
 import random
 import time
 
+# Compiled layout of the 18-byte U2AStatus packet: 8 status bytes, two
+# little-endian u16 counters, then 6 debug/control bytes.
+_MON_STRUCT = struct.Struct('<BBBBBBBBHHBBBBBB')
+assert _MON_STRUCT.size == 18
+
 def parse_system_monitor_data(data):
     """
     Parses the 18-byte U2AStatus array.
@@ -28,28 +33,18 @@ def parse_system_monitor_data(data):
         print(f"Error: Expected 18 bytes, got {len(data)}")
         return
 
-    if data[0] != 0xAA or data[1] != 0x55:
-        print(f"Error: Invalid Header {hex(data[0])} {hex(data[1])}")
-        return
-
-    core1_cpu = data[2]
-    core2_cpu = data[3]
-    core3_cpu = data[4]
-    core4_cpu = data[5]
-    vm0_mem = data[6]
-    vm1_mem = data[7]
-    
-    # Debug Info
-    idle_counter = data[8] | (data[9] << 8)
-    max_counter = data[10] | (data[11] << 8)
-    idle_pct_debug = data[12]
-    real_cpu_debug = data[13]
+    # One C-level unpack for all fields, including the little-endian
+    # u16 counters, instead of 14 per-byte indexes plus manual shifts.
+    (hdr1, hdr2,
+     core1_cpu, core2_cpu, core3_cpu, core4_cpu,
+     vm0_mem, vm1_mem,
+     idle_counter, max_counter,
+     idle_pct_debug, real_cpu_debug,
+     steering_ctrl, brake_ctrl, body_ctrl, ac_system) = _MON_STRUCT.unpack_from(data)
 
-    # New Variables
-    steering_ctrl = data[14]
-    brake_ctrl = data[15]
-    body_ctrl = data[16]
-    ac_system = data[17]
+    if hdr1 != 0xAA or hdr2 != 0x55:
+        print(f"Error: Invalid Header {hex(hdr1)} {hex(hdr2)}")
+        return
 
     print("-" * 30)
     print(f"System Monitor Data Parsing:")
@@ -110,24 +105,35 @@ if __name__ == "__main__":
     print(f"Connecting to {SERIAL_PORT} at {BAUD_RATE} baud...")
     
     try:
-        with serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=1) as ser:
+        # Short blocking-read timeout: the kernel wakes us as soon as data
+        # arrives, and an idle port costs one wakeup per 50 ms instead of
+        # a long stall (no sleep-based polling needed).
+        with serial.Serial(SERIAL_PORT, BAUD_RATE, timeout=0.05) as ser:
             print("Connected. Waiting for data...")
             
+            buf = bytearray()
             while True:
-                # Read 1 byte to find header
-                byte = ser.read(1)
-                if byte == b'\xAA':
-                    byte2 = ser.read(1)
-                    if byte2 == b'\x55':
-                        # Header found, read remaining 16 bytes
-                        data_payload = ser.read(16)
-                        if len(data_payload) == 16:
-                            full_data = b'\xAA\x55' + data_payload
-                            parse_system_monitor_data(full_data)
-                else:
-                    # Optional: Print a dot or something to show it's alive but no full packet
-                    # print(".", end="", flush=True)
-                    pass
+                # Read whatever has arrived in one call instead of scanning
+                # byte-by-byte with read(1) (one syscall per byte).
+                waiting = ser.in_waiting
+                chunk = ser.read(waiting if waiting else 18)
+                if chunk:
+                    buf += chunk
+
+                # Parse every complete 18-byte frame in the buffer
+                idx = buf.find(b'\xAA\x55')
+                while idx != -1 and len(buf) - idx >= 18:
+                    parse_system_monitor_data(bytes(buf[idx:idx + 18]))
+                    del buf[:idx + 18]
+                    idx = buf.find(b'\xAA\x55')
+
+                if idx > 0:
+                    # Drop garbage before the (partial) header
+                    del buf[:idx]
+                elif idx == -1 and len(buf) > 1:
+                    # No header found; keep the last byte in case it is
+                    # the first half of a header split across reads
+                    del buf[:-1]
                     
     except serial.SerialException as e:
         print(f"Serial Error: {e}")
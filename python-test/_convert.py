@@ -0,0 +1,68 @@
+"""
+控制指令报文的纯 Python 位打包核心。
+
+独立成模块是为了可选的 AOT 编译: 运行
+``python setup.py build_ext --inplace`` 后，编译出的本地扩展会在
+import 时自动取代本文件，未编译时按普通解释模块运行，行为一致。
+"""
+
+
+def build_vehicle_control_data(gear: int, linear_velocity_mms: int, steering_angle_raw: int, alive_counter: int, debug: bool = False) -> str:
+    """
+    根据用户提供的新位域交叉逻辑，反向构建控制指令数据报文。
+    
+    新位域定义:
+    - Speed (16 bits): data[2]<3..0> | data[1]<7..0> | data[0]<7..4>
+    - Gear (4 bits): data[0]<3..0>
+    - Angle (16 bits, Signed): data[4]<3..0> | data[3]<7..0> | data[2]<7..4>
+    
+    参数:
+        gear (int): 档位原始值 (0x04=D档)。
+        linear_velocity_mms (int): 速度值 (单位: mm/s)。
+        steering_angle_raw (int): 转向角原始值 (单位: 0.01 degree, 16位有符号整数)。
+        alive_counter (int): 心跳计数器 (0x00, 0x10, ..., 0xF0 循环)。
+    
+    返回:
+        str: 8字节的CAN数据报文十六进制字符串，字节间用空格分隔。
+    """
+    
+    # --- 1. 组合 data[0], data[1], data[2] (档位和速度) ---
+    # 原始 u32 = (速度值 << 4) | 档位值，直接位移取字节，省去 struct.pack
+    data0 = ((linear_velocity_mms << 4) | (gear & 0x0F)) & 0xFF
+    data1 = (linear_velocity_mms >> 4) & 0xFF
+    data2 = (linear_velocity_mms >> 12) & 0x0F
+    
+    # --- 2. 组合 data[2], data[3], data[4] (转向角) ---
+    # 转向角 (steering_angle_raw) 是一个 i16，按无符号取高低字节
+    angle_u16 = steering_angle_raw & 0xFFFF
+    high_byte = (angle_u16 >> 8) & 0xFF
+    low_byte = angle_u16 & 0xFF
+    
+    # 逆向重构 data[2], data[3], data[4] 的位域
+    
+    # 重构 data[4] (data[4]的低4位是 high_byte 的高4位)
+    data4 = (high_byte >> 4) & 0x0F
+    
+    # 重构 data[3] (data[3]的高4位是 high_byte 的低4位，低4位是 low_byte 的高4位)
+    data3 = ((high_byte & 0x0F) << 4) | (low_byte >> 4)
+    
+    # 重构 data[2] (data[2]的高4位是 low_byte 的低4位)，与步骤 1 的 data[2] 进行或操作
+    data2 = data2 | ((low_byte & 0x0F) << 4)
+    
+    # --- 3. 填充 data[5] 和 data[6] ---
+    data5 = 0x00  # Target Vehicle Braking (假设 0x00 为无制动)
+    data6 = alive_counter & 0xFF  # Alive Rolling Counter
+    
+    # --- 4/5. 预分配 8 字节缓冲并展开 BCC (异或校验)，免去列表拼接 ---
+    final_data = bytearray(8)
+    final_data[0] = data0
+    final_data[1] = data1
+    final_data[2] = data2
+    final_data[3] = data3
+    final_data[4] = data4
+    final_data[5] = data5
+    final_data[6] = data6
+    final_data[7] = data0 ^ data1 ^ data2 ^ data3 ^ data4 ^ data5 ^ data6
+    
+    # 转换为十六进制字符串，并用空格分隔 (C 级 bytes.hex 一次完成)
+    return final_data.hex(' ').upper()
@@ -1,4 +1,4 @@
-import struct
+from math import degrees
 from typing import Dict
 
 
@@ -13,13 +13,13 @@ def parse_control_data_4byte(hex_data: bytes) -> Dict[str, float]:
     if len(hex_data) != 4:
         raise ValueError(f"二进制数据长度必须是 4 字节，但收到了 {len(hex_data)} 字节。")
 
-    # '>h' = Big-Endian (大端序) signed short (i16)
-    linear_velocity_mms, = struct.unpack('>h', hex_data[0:2])
-    steering_angle_raw, = struct.unpack('>h', hex_data[2:4])
+    # 大端序 i16: int.from_bytes 比 struct.unpack 快且免去元组解包
+    linear_velocity_mms = int.from_bytes(hex_data[0:2], 'big', signed=True)
+    steering_angle_raw = int.from_bytes(hex_data[2:4], 'big', signed=True)
 
     return {
-        "linear_velocity_mms": int(linear_velocity_mms),
-        "steering_angle_rad": int(steering_angle_raw),
+        "linear_velocity_mms": linear_velocity_mms,
+        "steering_angle_rad": steering_angle_raw,
     }
 
 
@@ -43,21 +43,16 @@ def build_vehicle_control_data(gear: int, linear_velocity_mms: int, steering_ang
     """
     
     # --- 1. 组合 data[0], data[1], data[2] (档位和速度) ---
-    # 原始 u32 = (速度值 << 4) | 档位值
-    speed_shifted = linear_velocity_mms << 4
-    raw_u32 = speed_shifted | (gear & 0x0F)
-    
-    # 转换为 4 字节的小端序，只取前 3 字节
-    raw_bytes = struct.pack('<I', raw_u32)
-    data0 = raw_bytes[0]
-    data1 = raw_bytes[1]
-    data2 = raw_bytes[2]
+    # 原始 u32 = (速度值 << 4) | 档位值，直接位移取字节，省去 struct.pack
+    data0 = ((linear_velocity_mms << 4) | (gear & 0x0F)) & 0xFF
+    data1 = (linear_velocity_mms >> 4) & 0xFF
+    data2 = (linear_velocity_mms >> 12) & 0x0F
     
     # --- 2. 组合 data[2], data[3], data[4] (转向角) ---
-    # 转向角 (steering_angle_raw) 是一个 i16，需要分解为 high_byte 和 low_byte
-    angle_bytes = struct.pack('>h', steering_angle_raw)
-    high_byte = angle_bytes[0]
-    low_byte = angle_bytes[1]
+    # 转向角 (steering_angle_raw) 是一个 i16，按无符号取高低字节
+    angle_u16 = steering_angle_raw & 0xFFFF
+    high_byte = (angle_u16 >> 8) & 0xFF
+    low_byte = angle_u16 & 0xFF
     
     # 逆向重构 data[2], data[3], data[4] 的位域
     
@@ -74,23 +69,19 @@ def build_vehicle_control_data(gear: int, linear_velocity_mms: int, steering_ang
     data5 = 0x00  # Target Vehicle Braking (假设 0x00 为无制动)
     data6 = alive_counter & 0xFF  # Alive Rolling Counter
     
-    # --- 4. 组合前 7 字节并计算校验和 (BCC) ---
-    payload = [data0, data1, data2, data3, data4, data5, data6]
-    
-    # 计算 BCC (异或校验)
-    bcc = 0
-    for byte in payload:
-        bcc ^= byte
-    
-    data7 = bcc
-    
-    # --- 5. 组合成最终的 8 字节报文 ---
-    final_data = bytes(payload + [data7])
-    
-    # 转换为十六进制字符串，并用空格分隔
-    hex_string_spaced = ' '.join([f'{b:02X}' for b in final_data])
+    # --- 4/5. 预分配 8 字节缓冲并展开 BCC (异或校验)，免去列表拼接 ---
+    final_data = bytearray(8)
+    final_data[0] = data0
+    final_data[1] = data1
+    final_data[2] = data2
+    final_data[3] = data3
+    final_data[4] = data4
+    final_data[5] = data5
+    final_data[6] = data6
+    final_data[7] = data0 ^ data1 ^ data2 ^ data3 ^ data4 ^ data5 ^ data6
     
-    return hex_string_spaced
+    # 转换为十六进制字符串，并用空格分隔 (C 级 bytes.hex 一次完成)
+    return final_data.hex(' ').upper()
 
 def convert_to_new_protocol(hex_data_4_bytes: bytes, alive_counter) -> bytes:
 
@@ -104,7 +95,7 @@ def convert_to_new_protocol(hex_data_4_bytes: bytes, alive_counter) -> bytes:
     speedMs = int(res.get('linear_velocity_mms'))
     rad = res.get('steering_angle_rad') / 1000
     print(f"弧度: {rad}")
-    deg = rad_to_deg(rad)
+    deg = degrees(rad)
     print(f"角度: {deg}")
     steering_angle_raw = int(deg * 100)
     print(f"转向角原始值: {steering_angle_raw}")
@@ -122,8 +113,28 @@ def convert_to_new_protocol(hex_data_4_bytes: bytes, alive_counter) -> bytes:
         "can_data": hex_data,
     }
 
-def rad_to_deg(rad):
-    return rad * 180 / 3.141592653589793
+class ControlSender:
+    """
+    只在信号字节变化时才真正发送控制帧。
+
+    慢变轨迹上相邻两帧往往只有心跳计数器 (data[6]) 和 BCC 不同，
+    data[0..5] (档位/速度/转向角/制动) 完全一致。以这 6 个字节为键
+    去重，可以在匀速/静止段大幅降低 CAN 总线占用。
+    """
+
+    def __init__(self, write):
+        # write: 实际的发送回调，例如 ser.write
+        self._write = write
+        self._last_key = None
+
+    def send(self, frame_bytes: bytes) -> bool:
+        """发送一帧 8 字节报文；若信号字节与上一帧相同则跳过，返回是否真正发送。"""
+        key = bytes(frame_bytes[:6])
+        if key == self._last_key:
+            return False
+        self._last_key = key
+        self._write(frame_bytes)
+        return True
 
 
 def main():
@@ -1,80 +1,112 @@
-import struct
 import math
 import csv
 import os
 
+import numpy as np
+
+# pandas 的 C 解析器读大 CSV 比 np.loadtxt 更快，缺失时退回 NumPy
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# numba 为可选依赖: 安装后批量打包走 JIT 内核，否则退回 NumPy 向量化路径
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 # 定义 16 位有符号整数的限制，用于转向角原始值
 I16_MIN = -32768
 I16_MAX = 32767
 
-def build_vehicle_control_data(gear: int, linear_velocity_mms: int, steering_angle_raw: int, alive_counter: int, debug: bool = False) -> str:
+# 标量打包核心在 _convert.py (可用 setup.py 预编译为本地扩展)
+from _convert import build_vehicle_control_data
+
+if njit is not None:
+    @njit(cache=True, boundscheck=False)
+    def _pack_frames(vels, raw_u16, gear, out):
+        """JIT 内核: 逐行填充 (N, 8) 的 uint8 报文数组 (含 BCC)。"""
+        for i in range(vels.size):
+            vel = vels[i]
+            high_byte = (raw_u16[i] >> 8) & 0xFF
+            low_byte = raw_u16[i] & 0xFF
+            d0 = ((vel << 4) & 0xFF) | (gear & 0x0F)
+            d1 = (vel >> 4) & 0xFF
+            d2 = ((vel >> 12) & 0x0F) | ((low_byte & 0x0F) << 4)
+            d3 = ((high_byte & 0x0F) << 4) | (low_byte >> 4)
+            d4 = (high_byte >> 4) & 0x0F
+            d6 = (i * 0x10) & 0xFF
+            out[i, 0] = d0
+            out[i, 1] = d1
+            out[i, 2] = d2
+            out[i, 3] = d3
+            out[i, 4] = d4
+            out[i, 5] = 0
+            out[i, 6] = d6
+            out[i, 7] = d0 ^ d1 ^ d2 ^ d3 ^ d4 ^ d6
+
+    # 导入时用小数组预热一次，把编译开销移出首个真实批次
+    _pack_frames(np.zeros(1, np.int32), np.zeros(1, np.uint16), 0x04,
+                 np.empty((1, 8), np.uint8))
+else:
+    _pack_frames = None
+
+
+def build_vehicle_control_frames(speeds: np.ndarray, angles_deg: np.ndarray, gear: int = 0x04):
     """
-    根据用户提供的新位域交叉逻辑，反向构建控制指令数据报文。
-    
-    新位域定义:
-    - Speed (16 bits): data[2]<3..0> | data[1]<7..0> | data[0]<7..4>
-    - Gear (4 bits): data[0]<3..0>
-    - Angle (16 bits, Signed): data[4]<3..0> | data[3]<7..0> | data[2]<7..4>
-    
+    build_vehicle_control_data 的批量向量化版本。
+
+    一次性对整条轨迹计算 8 字节报文，避免逐行调用 struct.pack
+    和 Python 级的 BCC 异或循环。
+
     参数:
+        speeds (np.ndarray): 速度数组 (单位: mm/s)。
+        angles_deg (np.ndarray): 转向角数组 (单位: degree)。
         gear (int): 档位原始值 (0x04=D档)。
-        linear_velocity_mms (int): 速度值 (单位: mm/s)。
-        steering_angle_raw (int): 转向角原始值 (单位: 0.01 degree, 16位有符号整数)。
-        alive_counter (int): 心跳计数器 (0x00, 0x10, ..., 0xF0 循环)。
-    
+
     返回:
-        str: 8字节的CAN数据报文十六进制字符串，字节间用空格分隔。
+        (frames, clamped): frames 是 (N, 8) 的 uint8 数组，每行为一帧报文;
+        clamped 是布尔数组，标记转向角原始值超出 i16 范围被钳制的行。
     """
-    
-    # --- 1. 组合 data[0], data[1], data[2] (档位和速度) ---
-    # 原始 u32 = (速度值 << 4) | 档位值
-    speed_shifted = linear_velocity_mms << 4
-    raw_u32 = speed_shifted | (gear & 0x0F)
-    
-    # 转换为 4 字节的小端序，只取前 3 字节
-    raw_bytes = struct.pack('<I', raw_u32)
-    data0 = raw_bytes[0]
-    data1 = raw_bytes[1]
-    data2 = raw_bytes[2]
-    
-    # --- 2. 组合 data[2], data[3], data[4] (转向角) ---
-    # 转向角 (steering_angle_raw) 是一个 i16，需要分解为 high_byte 和 low_byte
-    angle_bytes = struct.pack('>h', steering_angle_raw)
-    high_byte = angle_bytes[0]
-    low_byte = angle_bytes[1]
-    
-    # 逆向重构 data[2], data[3], data[4] 的位域
-    
-    # 重构 data[4] (data[4]的低4位是 high_byte 的高4位)
+    vel = speeds.astype(np.int32)
+    raw_angle = (angles_deg * 100.0).astype(np.int32)
+
+    # 钳制转向角原始值到 i16 范围，并记录哪些行被钳制
+    clamped = (raw_angle > I16_MAX) | (raw_angle < I16_MIN)
+    raw_u16 = np.clip(raw_angle, I16_MIN, I16_MAX).astype(np.int16).view(np.uint16)
+
+    # numba 可用时走 JIT 内核
+    if _pack_frames is not None:
+        frames = np.empty((vel.size, 8), dtype=np.uint8)
+        _pack_frames(vel, raw_u16, gear, frames)
+        return frames, clamped
+
+    # 档位和速度: data[2]<3..0> | data[1]<7..0> | data[0]<7..4>
+    data0 = ((vel << 4) & 0xFF) | (gear & 0x0F)
+    data1 = (vel >> 4) & 0xFF
+    data2 = (vel >> 12) & 0x0F
+
+    # 转向角 (大端序 i16): data[4]<3..0> | data[3]<7..0> | data[2]<7..4>
+    high_byte = (raw_u16 >> 8) & 0xFF
+    low_byte = raw_u16 & 0xFF
     data4 = (high_byte >> 4) & 0x0F
-    
-    # 重构 data[3] (data[3]的高4位是 high_byte 的低4位，低4位是 low_byte 的高4位)
     data3 = ((high_byte & 0x0F) << 4) | (low_byte >> 4)
-    
-    # 重构 data[2] (data[2]的高4位是 low_byte 的低4位)，与步骤 1 的 data[2] 进行或操作
     data2 = data2 | ((low_byte & 0x0F) << 4)
-    
-    # --- 3. 填充 data[5] 和 data[6] ---
-    data5 = 0x00  # Target Vehicle Braking (假设 0x00 为无制动)
-    data6 = alive_counter & 0xFF  # Alive Rolling Counter
-    
-    # --- 4. 组合前 7 字节并计算校验和 (BCC) ---
-    payload = [data0, data1, data2, data3, data4, data5, data6]
-    
-    # 计算 BCC (异或校验)
-    bcc = 0
-    for byte in payload:
-        bcc ^= byte
-    
-    data7 = bcc
-    
-    # --- 5. 组合成最终的 8 字节报文 ---
-    final_data = bytes(payload + [data7])
-    
-    # 转换为十六进制字符串，并用空格分隔
-    hex_string_spaced = ' '.join([f'{b:02X}' for b in final_data])
-    
-    return hex_string_spaced
+
+    n = vel.size
+    # 制动固定为 0x00，心跳计数器按 0x10 步长循环
+    data5 = np.zeros(n, dtype=np.uint8)
+    data6 = (np.arange(n, dtype=np.uint32) * 0x10) & 0xFF
+
+    payload = np.stack([data0, data1, data2, data3, data4, data5, data6], axis=1).astype(np.uint8)
+
+    # BCC (异或校验): 一次 C 级归约替代逐字节 Python 循环
+    bcc = np.bitwise_xor.reduce(payload, axis=1)
+    frames = np.concatenate([payload, bcc[:, None]], axis=1)
+
+    return frames, clamped
+
 
 def export_to_csv(data: list, output_filepath: str):
     """将处理后的数据列表写入 CSV 文件。"""
@@ -102,79 +134,71 @@ def process_csv_to_can(input_filepath: str, output_filepath: str):
     # 固定参数
     TARGET_GEAR = 0x04  # D 档 (4 bits)
     ALIVE_COUNTER_STEP = 0x10 # 心跳计数器步长 (16)
-    
-    # 单位转换常量
-    SPEED_M_S_TO_MM_S = 1000
-    ANGLE_DEG_TO_RAW = 100
-    
-    # 心跳计数器初始化
-    alive_counter = 0 
-    output_data = []
-
 
     try:
         if not os.path.exists(input_filepath):
             print(f"错误: 找不到输入文件 '{input_filepath}'。请创建一个示例文件。")
             return
 
+        # 从标题行定位 'speed' 和 'angle' 列
         with open(input_filepath, mode='r', encoding='utf-8') as file:
-            reader = csv.DictReader(file)
-            
-            if 'speed' not in reader.fieldnames or 'angle' not in reader.fieldnames:
-                print("错误: CSV文件必须包含 'speed' 和 'angle' 两列。")
-                return
-
-            print("\n" + "=" * 70)
-            print(f"开始处理 CSV 数据 (第一行启用调试输出)...")
-            print("=" * 70)
-            
-            for row_index, row in enumerate(reader):
-                
-                    
-                try:
-                    linear_velocity_mms = int(float(row['speed']))
-
-                    angle_deg = float(row['angle'])
-                    steering_angle_raw = int(angle_deg * ANGLE_DEG_TO_RAW)
-                    
-                    # 生成 Hex 数据，第一行启用调试
-                    hex_data = build_vehicle_control_data(
-                        gear=TARGET_GEAR,
-                        linear_velocity_mms=linear_velocity_mms,
-                        steering_angle_raw=steering_angle_raw,
-                        alive_counter=alive_counter
-                    )
-                    
-                    # 记录结果
-                    raw_angle_value = int(angle_deg * ANGLE_DEG_TO_RAW)
-                    clamped_status = "No"
-                    if raw_angle_value > I16_MAX or raw_angle_value < I16_MIN:
-                        clamped_status = "Yes"
-                        
-                    output_data.append({
-                        "can_id":"0x18C4D2D0",
-                        "can_data": hex_data,
-                        "interval_ms": 10,
-                        "Index": row_index + 1,
-                        "Speed_mm/s": f"{linear_velocity_mms}",
-                        "Angle_deg": f"{angle_deg:.2f}",
-                        "Angle_Clamped": clamped_status,
-                        "AliveCounter_Hex": f"{alive_counter:02X}"
-                    })
-                    
-                    # 更新心跳计数器 (00 -> 10 -> ... -> F0 -> 00 循环)
-                    alive_counter = (alive_counter + ALIVE_COUNTER_STEP) % 0x100
-
-                except ValueError as e:
-                    print(f"警告: 第 {row_index + 1} 行数据转换错误 (值: {row})。跳过。错误: {e}")
-                
-            # 打印处理结果到控制台
-            print("\n" + "=" * 70)
-            print(f"数据处理完成，共 {len(output_data)} 行数据。")
-            
-            # 6. 导出数据到 CSV
-            export_to_csv(output_data, output_filepath)
-            
+            header = file.readline().strip().split(',')
+
+        if 'speed' not in header or 'angle' not in header:
+            print("错误: CSV文件必须包含 'speed' 和 'angle' 两列。")
+            return
+
+        speed_col = header.index('speed')
+        angle_col = header.index('angle')
+
+        print("\n" + "=" * 70)
+        print(f"开始处理 CSV 数据 (NumPy 批量模式)...")
+        print("=" * 70)
+
+        # 一次性加载两列数据为 NumPy 数组，避免 DictReader 逐行构建字典
+        if pd is not None:
+            df = pd.read_csv(input_filepath, usecols=['speed', 'angle'],
+                             dtype={'speed': np.float32, 'angle': np.float32})
+            speeds = df['speed'].to_numpy()
+            angles_deg = df['angle'].to_numpy()
+        else:
+            arr = np.loadtxt(input_filepath, delimiter=',', skiprows=1,
+                             usecols=(speed_col, angle_col), dtype=np.float32, ndmin=2)
+            speeds = arr[:, 0]
+            angles_deg = arr[:, 1]
+
+        # 批量生成所有 8 字节报文
+        frames, clamped = build_vehicle_control_frames(speeds, angles_deg, gear=TARGET_GEAR)
+        row_count = frames.shape[0]
+
+        # 整块格式化: 对连续缓冲做一次 hex()，每行报文占 24 个字符
+        # ("XX " x 8，含行间分隔空格)，按偏移切片取回
+        all_hex = frames.tobytes().hex(' ').upper()
+
+        # 6. 流式写出 CSV: 逐行写元组，不再为每行构建字典缓存在内存里
+        fieldnames = ["can_id", "can_data", "interval_ms", "Index",
+                      "Speed_mm/s", "Angle_deg", "Angle_Clamped", "AliveCounter_Hex"]
+        with open(output_filepath, mode='w', newline='', encoding='utf-8') as out:
+            writer = csv.writer(out)
+            writer.writerow(fieldnames)
+            for row_index in range(row_count):
+                alive_counter = (row_index * ALIVE_COUNTER_STEP) % 0x100
+                writer.writerow((
+                    "0x18C4D2D0",
+                    all_hex[row_index * 24:row_index * 24 + 23],
+                    10,
+                    row_index + 1,
+                    int(speeds[row_index]),
+                    f"{angles_deg[row_index]:.2f}",
+                    "Yes" if clamped[row_index] else "No",
+                    f"{alive_counter:02X}",
+                ))
+
+        # 打印处理结果到控制台
+        print("\n" + "=" * 70)
+        print(f"数据处理完成，共 {row_count} 行数据。")
+        print(f"\n✅ 成功导出数据到文件: {output_filepath}")
+
     except Exception as e:
         print(f"处理文件时发生未预期的错误: {e}")
 
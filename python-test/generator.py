@@ -1,8 +1,9 @@
-import random
 import time
 import abc
 from abc import ABC, abstractmethod
 
+import numpy as np
+
 
 class DataGenerator(ABC):
     """
@@ -10,9 +11,9 @@ class DataGenerator(ABC):
     强制要求子类实现 generate_data 方法。
     """
     @abstractmethod
-    def generate_data(self) -> list[int]:
+    def generate_data(self) -> bytes:
         """
-        抽象方法：生成并返回下一帧数据的字节列表（CAN 帧数据部分或完整数据包）。
+        抽象方法：生成并返回下一帧数据的字节串（CAN 帧数据部分或完整数据包）。
 
         注意：子类需要根据自己的逻辑决定是返回 CAN 帧数据（8字节）还是一个完整数据包。
         对于您的雷达数据，它返回的是 8 字节的 CAN 数据部分。
@@ -22,10 +23,11 @@ class SmoothDataGenerator(DataGenerator):
     """
     生成平滑且符合特定范围的测试数据。
     """
-    def __init__(self):
-        # 初始化上次的值，用于平滑过渡
-        self.last_cpu = [10.0, 10.0, 10.0]
-        self.last_memory = 40.0
+    def __init__(self, seed=None):
+        # 每个实例独立的 numpy Generator: 不碰模块级 random 的共享
+        # Mersenne Twister (及其内部锁)，4 个平滑通道的高斯目标值
+        # 一次 C 调用采完；传入 seed 还可以得到可复现的数据流
+        self._rng = np.random.default_rng(seed)
 
         # 定义期望的均值和标准差 (Std Dev)
         # CPU: 均值 10，标准差 3 (大部分在 10 ± 6 之间，即 4% 到 16%)
@@ -39,75 +41,84 @@ class SmoothDataGenerator(DataGenerator):
         # 定义平滑因子：新值与旧值的混合比例。越小越平滑。
         self.SMOOTHING_FACTOR = 0.20 # 0.15 意味着新值占 15%，旧值占 85%
 
-    def _get_smooth_value(self, last_val, mean, std_dev, min_val=0, max_val=100):
-        """生成一个平滑过渡、符合高斯分布且在 min/max 范围内的值。"""
+        # 通道向量: [cpu0, cpu1, cpu2, memory]，平滑递推在 4 个通道上
+        # 一次完成
+        self._means = np.array([self.CPU_MEAN] * 3 + [self.MEMORY_MEAN])
+        self._stds = np.array([self.CPU_STD] * 3 + [self.MEMORY_STD])
+        self._state = np.array([10.0, 10.0, 10.0, 40.0])
 
-        # 1. 生成基于高斯分布的目标值 (更真实)
-        target_val = random.gauss(mean, std_dev)
+        self._alpha = self.SMOOTHING_FACTOR
+        self._one_minus_alpha = 1.0 - self.SMOOTHING_FACTOR
 
-        # 2. 将目标值限制在 0-100 范围内
-        target_val = max(min_val, min(max_val, target_val))
+        # 持久的 13 字节帧缓冲: 常量字段只写一次，每帧只覆写 4 个
+        # 平滑通道再 tobytes()，不再逐字节构建列表
+        self._frame = np.empty(13, dtype=np.uint8)
+        self._frame[0:5] = (0x09, 0x02, 0x00, 0x00, 0x08)  # CAN ID 0x209 + data length
+        self._frame[9:13] = 2  # 系统状态固定为 2 (绿)
 
-        # 3. 计算平滑后的当前值 (当前值 = 旧值 * (1 - 因子) + 目标值 * 因子)
-        new_val = last_val * (1 - self.SMOOTHING_FACTOR) + target_val * self.SMOOTHING_FACTOR
+    def generate_data(self) -> bytes:
+        """生成一帧新的测试数据"""
 
-        return new_val
+        # 4 个通道的高斯目标值一次采样并限制在 0-100
+        targets = self._rng.normal(self._means, self._stds).clip(0.0, 100.0)
 
-    def generate_data(self):
-        """生成一帧新的测试数据"""
+        # 平滑递推 (当前值 = 旧值 * (1 - 因子) + 目标值 * 因子)，原地更新
+        self._state *= self._one_minus_alpha
+        self._state += targets * self._alpha
+
+        self._frame[5:9] = np.rint(self._state)
+        return self._frame.tobytes()
+
+    def generate_batch(self, n: int) -> np.ndarray:
+        """
+        批量生成 n 帧数据，返回 (n, 13) 的 uint8 数组，每行与
+        generate_data 的返回格式一致。
 
-        # --- 1. CPU 利用率 (平滑且低值) ---
-        new_cpus = []
-        for i in range(3):
-            new_cpu = self._get_smooth_value(
-                self.last_cpu[i],
-                self.CPU_MEAN,
-                self.CPU_STD
-            )
-            new_cpus.append(int(round(new_cpu, 0))) # 保留两位小数
-            self.last_cpu[i] = new_cpu # 更新上一次的值
-
-        # --- 2. 内存利用率 (平滑且约 40%) ---
-        new_memory = self._get_smooth_value(
-            self.last_memory,
-            self.MEMORY_MEAN,
-            self.MEMORY_STD
-        )
-        new_memory_rounded = int(round(new_memory, 0))
-        self.last_memory = new_memory # 更新上一次的值
-
-        # --- 3. 系统状态 (保持随机跳变，因为状态码通常是离散的) ---
-        steering = random.randint(0, 2)
-        brake = random.randint(0, 2)
-        body = random.randint(0, 2)
-        ac = random.randint(0, 2)
-
-        return [
-            0x09, 0x02, 0x00, 0x00, # CAN ID 0x209
-            0x08,                   # data length
-            *new_cpus,              # cpu1, cpu2, cpu3
-            new_memory_rounded,     # memory
-            2, 2, 2, 2
-        ]
-
-        # return [
-        #     *new_cpus,            # cpu1, cpu2, cpu3
-        #     new_memory_rounded,   # memory
-        #     steering, brake, body, ac
-        # ]
+        高斯目标值用一次 rng.normal 批量采样，平滑递推在 4 个通道上
+        向量化，只保留沿时间轴的串行循环。平滑状态与逐帧生成共享，
+        批量调用后继续 generate_data 不会跳变。
+        """
+        # 一次性采样所有高斯目标值并限制在 0-100
+        targets = self._rng.normal(self._means, self._stds, size=(n, 4)).clip(0.0, 100.0)
+
+        # 平滑递推是串行的，但每步同时处理 4 个通道
+        state = self._state
+        smoothed = np.empty((n, 4))
+        for i in range(n):
+            state = state * self._one_minus_alpha + targets[i] * self._alpha
+            smoothed[i] = state
+
+        # 状态回写，保证与逐帧生成交替使用时连续
+        self._state = state
+
+        out = np.empty((n, 13), dtype=np.uint8)
+        out[:, 0:5] = (0x09, 0x02, 0x00, 0x00, 0x08)  # CAN ID 0x209 + data length
+        out[:, 5:9] = np.rint(smoothed)
+        out[:, 9:13] = 2  # 系统状态与 generate_data 一致，固定为 2 (绿)
+        return out
 
 
 class RadarDataGenerator(DataGenerator):
     """
     生成模拟的雷达数据。
     """
-    def __init__(self):
+    def __init__(self, seed=None):
+        # 实例独立的 numpy Generator，与 SmoothDataGenerator 相同的理由
+        self._rng = np.random.default_rng(seed)
+
         # 存储4个雷达的距离值，用于平滑
         self.last_distances = [700.0, 750.0, 650.0, 800.0]
         self.current_radar_id = 1
         self.SMOOTHING_FACTOR = 0.25
         self.DISTANCE_STD = 100.0 # 距离波动的标准差
 
+        # 持久的 13 字节帧缓冲: 固定字段只写一次，
+        # 每帧只覆写 CAN ID 低字节、雷达编号和距离两个字节
+        self._frame = np.empty(13, dtype=np.uint8)
+        self._frame[1:5] = (0x05, 0x00, 0x00, 0x04)  # CAN ID 高 3 字节 + data length
+        self._frame[6] = 0x83                        # Byte 6: 固定值 0x83
+        self._frame[9:13] = 0                        # Byte 9-12: 固定为 0x00
+
     def _get_smooth_distance(self, index: int, min_dist=200, max_dist=1400) -> int:
         """生成一个平滑过渡的雷达距离值，并在范围内波动。"""
 
@@ -115,7 +126,7 @@ class RadarDataGenerator(DataGenerator):
 
         # 目标值以当前值或中心值(例如700)为中心随机波动
         # 使用当前 last_val 作为均值，模拟围绕当前距离小幅波动
-        target_val = random.gauss(last_val, self.DISTANCE_STD)
+        target_val = self._rng.normal(last_val, self.DISTANCE_STD)
 
         # 限制范围
         target_val = max(min_dist, min(max_dist, target_val))
@@ -127,14 +138,7 @@ class RadarDataGenerator(DataGenerator):
         self.last_distances[index] = new_val
         return int(round(new_val, 0))
 
-    def _distance_to_two_bytes(self, distance: int) -> list[int]:
-        """将距离整数转换为 2 字节（高位在前）列表。"""
-        # distance 范围在 200-1400，需要 2 字节 (16 bit)
-        # 协议通常使用大端序 (big-endian)
-        byte_representation = distance.to_bytes(length=2, byteorder='big')
-        return list(byte_representation)
-
-    def generate_data(self) -> list[int]:
+    def generate_data(self) -> bytes:
         """
         生成一个 8 字节的雷达数据包，并自动递增雷达编号 (1-4)。
         """
@@ -143,26 +147,23 @@ class RadarDataGenerator(DataGenerator):
         # 1. 生成平滑距离 (使用当前 ID - 1 作为索引)
         distance_int = self._get_smooth_distance(radar_id - 1)
 
-        # 2. 转换距离为 2 字节
-        distance_bytes = self._distance_to_two_bytes(distance_int)
+        # 2. 距离拆为大端序 2 字节: 位移代替 to_bytes + list 的分配
+        dist_hi = (distance_int >> 8) & 0xFF
+        dist_lo = distance_int & 0xFF
 
-        # 3. 构建 8 字节数据包: [编号, 0x83, 距离高, 距离低, 0x00, 0x00, 0x00, 0x00]
-        packet = [
-            0x20+radar_id, 0x05, 0x00, 0x00,     #Byte 0-3: CAN ID
-            0x04,                # Byte 4: data length
-            radar_id,            # Byte 5: 雷达编号 (1-4)
-            0x83,                # Byte 6: 固定值 0x83
-            distance_bytes[0],   # Byte 7: 距离高字节
-            distance_bytes[1],   # Byte 8: 距离低字节
-            0x00, 0x00, 0x00, 0x00 # Byte 9-12: 固定为 0x00
-        ]
+        # 3. 覆写帧缓冲的变化字段 (其余字段在 __init__ 里写好)
+        frame = self._frame
+        frame[0] = 0x20 + radar_id   # Byte 0-3: CAN ID
+        frame[5] = radar_id          # Byte 5: 雷达编号 (1-4)
+        frame[7] = dist_hi           # Byte 7: 距离高字节
+        frame[8] = dist_lo           # Byte 8: 距离低字节
 
         # 4. 递增雷达编号 (1, 2, 3, 4, 1, 2, ...)
         self.current_radar_id = (self.current_radar_id % 4) + 1
 
-        print(f"   [Radar] ID={radar_id}, Dist={distance_int} -> Hex={format_can_message(distance_bytes)}")
+        print(f"   [Radar] ID={radar_id}, Dist={distance_int} -> Hex={format_can_message((dist_hi, dist_lo))}")
 
-        return packet
+        return frame.tobytes()
 
 # --- 占位符辅助函数 ---
 def format_can_message(data):
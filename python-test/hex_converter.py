@@ -1,3 +1,72 @@
+import numpy as np
+
+# numba 可选: 有则批量转换走 JIT 内核，无则用 NumPy 向量化
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+# ASCII 码 -> 十六进制 nibble 值的 256 项查找表 (非法字符为 0xFF)
+_NIBBLE_LUT = np.full(256, 0xFF, np.uint8)
+_NIBBLE_LUT[ord('0'):ord('9') + 1] = np.arange(10)
+_NIBBLE_LUT[ord('A'):ord('F') + 1] = np.arange(10, 16)
+_NIBBLE_LUT[ord('a'):ord('f') + 1] = np.arange(10, 16)
+
+if njit is not None:
+    @njit(cache=True)
+    def _hex_nibbles_to_int(nibbles, bit_width, signed, out):
+        half = 1 << (bit_width - 1)
+        full = 1 << bit_width
+        for i in range(nibbles.shape[0]):
+            v = 0
+            for j in range(nibbles.shape[1]):
+                v = (v << 4) | nibbles[i, j]
+            if signed and v >= half:
+                v -= full
+            out[i] = v
+else:
+    _hex_nibbles_to_int = None
+
+
+def hex_batch_to_dec(hex_strings, bit_width=16, signed=True):
+    """
+    hex_dec_converter 的批量版本: 一次把 N 个等宽十六进制字符串转为整数。
+
+    所有字符串必须恰好是 bit_width//4 个字符 (不带 '0x' 前缀)。
+    逐字符查 LUT 拼 nibble，绕开 N 次 int(s, 16) 的解析和装箱开销；
+    安装了 numba 时内层循环走 JIT。返回 int64 的 NumPy 数组。
+    """
+    width = bit_width // 4
+    joined = ''.join(hex_strings).encode('ascii')
+    n = len(joined) // width
+    if n * width != len(joined):
+        raise ValueError(f"所有十六进制字符串必须恰好 {width} 个字符。")
+
+    codes = np.frombuffer(joined, np.uint8).reshape(n, width)
+    nibbles = _NIBBLE_LUT[codes]
+    if (nibbles == 0xFF).any():
+        raise ValueError("输入包含非十六进制字符。")
+
+    out = np.empty(n, np.int64)
+    if _hex_nibbles_to_int is not None:
+        _hex_nibbles_to_int(nibbles, bit_width, signed, out)
+        return out
+
+    # NumPy 回退: 列数只有 bit_width//4，按列拼接仍是向量化的
+    out[:] = 0
+    for j in range(width):
+        out <<= 4
+        out |= nibbles[:, j]
+    if signed:
+        out[out >= (1 << (bit_width - 1))] -= (1 << bit_width)
+    return out
+
+
+# 每个 bit_width 的派生常量缓存: (无符号上限, 有符号上限, 有符号下限, 格式串)
+# 避免每次调用重新做 2**bit_width 求幂和嵌套格式串解析
+_WIDTH_CACHE = {}
+
+
 def hex_dec_converter(value, target_type='dec', signed=True, bit_width=16):
     """
     十六进制和十进制之间的转换器，支持有符号和无符号。
@@ -14,18 +83,25 @@ def hex_dec_converter(value, target_type='dec', signed=True, bit_width=16):
     转换后的值（str 或 int），如果输入无效则返回 None。
     """
     
-    max_unsigned = 2**bit_width
-    max_signed = 2**(bit_width - 1) - 1
-    min_signed = -2**(bit_width - 1)
+    cached = _WIDTH_CACHE.get(bit_width)
+    if cached is None:
+        cached = _WIDTH_CACHE[bit_width] = (
+            1 << bit_width,
+            (1 << (bit_width - 1)) - 1,
+            -(1 << (bit_width - 1)),
+            f"0{bit_width // 4}X",
+        )
+    max_unsigned, max_signed, min_signed, hex_spec = cached
 
     try:
         if target_type == 'dec':
             # --- 从十六进制转为十进制 ---
-            # 移除 '0x' 前缀并确保是大写
-            hex_str = str(value).strip().upper()
-            if hex_str.startswith('0X'):
+            # 移除 '0x' 前缀; int(x, 16) 本身兼容大小写和两端空白，
+            # 不必先做 strip().upper() 的字符串拷贝
+            hex_str = value if isinstance(value, str) else str(value)
+            if hex_str[:2] in ('0x', '0X'):
                 hex_str = hex_str[2:]
-            
+
             # 先按无符号方式解析其数值
             unsigned_val = int(hex_str, 16)
             
@@ -33,19 +109,20 @@ def hex_dec_converter(value, target_type='dec', signed=True, bit_width=16):
                 # 无符号转换：直接返回数值
                 return unsigned_val
             else:
-                # 有符号转换 (补码)
-                if unsigned_val > max_signed:
-                    # 如果数值大于最大正数 (即符号位为 1)，则为负数
-                    # 负数 = 数值 - 2^bit_width
-                    signed_val = unsigned_val - max_unsigned
-                else:
-                    # 如果数值小于等于最大正数 (即符号位为 0)，则为正数
-                    signed_val = unsigned_val
-                return signed_val
+                # 有符号转换 (补码): 无分支符号扩展，
+                # 符号位为 1 时减去 2^bit_width，为 0 时减 0
+                sign_bit = (unsigned_val >> (bit_width - 1)) & 1
+                return unsigned_val - (sign_bit << bit_width)
 
         elif target_type == 'hex':
             # --- 从十进制转为十六进制 ---
-            dec_val = int(value)
+            # 已是 int 直接使用；字符串给定显式 base=10，跳过基数自动探测
+            if isinstance(value, int):
+                dec_val = value
+            elif isinstance(value, str):
+                dec_val = int(value, 10)
+            else:
+                dec_val = int(value)
             
             if not signed:
                 # 无符号转换
@@ -53,7 +130,7 @@ def hex_dec_converter(value, target_type='dec', signed=True, bit_width=16):
                     raise ValueError(f"无符号模式下，十进制值 {dec_val} 超出 {bit_width} 位无符号范围 [0, {max_unsigned - 1}]。")
                 
                 # 直接转换为十六进制字符串，并填充到所需的位宽
-                return f"{dec_val:0{bit_width//4}X}"
+                return format(dec_val, hex_spec)
             
             else:
                 # 有符号转换 (补码)
@@ -68,7 +145,7 @@ def hex_dec_converter(value, target_type='dec', signed=True, bit_width=16):
                     val_to_convert = max_unsigned + dec_val
 
                 # 转换为十六进制字符串，并填充到所需的位宽
-                return f"{val_to_convert:0{bit_width//4}X}"
+                return format(val_to_convert, hex_spec)
 
         else:
             print("错误: target_type 必须是 'dec' 或 'hex'。")
@@ -7,16 +7,22 @@ def svg_to_ico(svg_path, ico_path, sizes=((16, 16), (32, 32), (48, 48), (256, 25
     Converts an SVG file to an ICO file containing multiple sizes.
     """
     
-    # 1. Rasterize SVG to multiple PNGs (in memory)
-    png_images = []
-    
-    for width, height in sizes:
-        # CairoSVG renders the SVG into a PNG byte string
-        png_bytes = cairosvg.svg2png(url=svg_path, output_width=width, output_height=height)
-        
-        # Load the PNG bytes into a Pillow Image object
-        img = Image.open(io.BytesIO(png_bytes))
-        png_images.append(img)
+    # 1. Rasterize SVG once at the largest size, then downsample (in memory).
+    # SVG parsing and Cairo setup dominate, so one render + LANCZOS resizes
+    # is much cheaper than re-rendering the vector source per size.
+    with open(svg_path, 'rb') as f:
+        svg_bytes = f.read()
+
+    max_width, max_height = max(sizes)
+    png_bytes = cairosvg.svg2png(bytestring=svg_bytes,
+                                 output_width=max_width, output_height=max_height)
+    big_img = Image.open(io.BytesIO(png_bytes)).convert('RGBA')
+
+    png_images = [
+        big_img if (width, height) == (max_width, max_height)
+        else big_img.resize((width, height), Image.LANCZOS)
+        for width, height in sizes
+    ]
     
     # 2. Save the PNG images as a single ICO file
     if not png_images:
@@ -1,8 +1,22 @@
 import numpy as np
-import pandas as pd
 from scipy.interpolate import make_interp_spline
-from scipy.signal import savgol_filter
+from scipy.ndimage import convolve1d, uniform_filter1d
+from scipy.signal import savgol_coeffs
 import math
+from functools import lru_cache
+
+
+# Savitzky-Golay 系数按 (窗口, 阶数) 缓存: 系数合成里的最小二乘只做一次，
+# 之后的平滑只是一次 C 级卷积 (边界用最近值延拓，替代 mode='interp' 的
+# 边缘多项式拟合，对本脚本的合成曲线差异可忽略)
+@lru_cache(maxsize=None)
+def _savgol_coeffs_cached(window_len, order):
+    return savgol_coeffs(window_len, order)
+
+
+def _savgol_smooth(x, window_len, order):
+    return convolve1d(x, _savgol_coeffs_cached(window_len, order), mode='nearest')
+
 
 def start_mock(output_filename='driving_data_final_version_speed_to_zero.csv'):
 
@@ -35,10 +49,11 @@ def start_mock(output_filename='driving_data_final_version_speed_to_zero.csv'):
     STOP_START_INDEX = DATA_POINTS - STOP_POINTS
 
     # --- 1. 生成基础的、全局平滑的曲线（角度） ---
-    np.random.seed(42) 
+    # PCG64 比老的全局 Mersenne Twister 快 2-3 倍，且种子状态是局部的
+    rng = np.random.default_rng(42)
     
     # 生成关键点
-    anchor_angles = np.random.uniform(-MAX_ANGLE * 0.8, MAX_ANGLE * 0.8, BASE_ANCHOR_COUNT) 
+    anchor_angles = rng.uniform(-MAX_ANGLE * 0.8, MAX_ANGLE * 0.8, BASE_ANCHOR_COUNT) 
     
     # 强制开头和结尾
     INITIAL_STRAIGHT_ANCHORS = 2 
@@ -56,28 +71,25 @@ def start_mock(output_filename='driving_data_final_version_speed_to_zero.csv'):
     if window_len % 2 == 0: window_len -= 1
     if window_len < 3: window_len = 3
     
-    raw_angle_data = savgol_filter(raw_angle_data, window_len, 3) 
+    raw_angle_data = _savgol_smooth(raw_angle_data, window_len, 3)
     raw_angle_data = np.clip(raw_angle_data, -MAX_ANGLE, MAX_ANGLE)
 
     
     # --- 2. 创建平滑的直行区域 (软阈值归零) ---
+    # 阈值外 factor=1，阈值内 factor=|x|/T，一次乘法完成衰减，
+    # 免去布尔掩码的 gather/scatter 往返
     final_angle_data = np.copy(raw_angle_data)
-    small_angle_mask = np.abs(final_angle_data) < ZERO_THRESHOLD
-    
-    if np.any(small_angle_mask):
-        decay_factor = np.abs(final_angle_data[small_angle_mask]) / ZERO_THRESHOLD
-        final_angle_data[small_angle_mask] = final_angle_data[small_angle_mask] * decay_factor
+    decay_factor = np.minimum(np.abs(final_angle_data), ZERO_THRESHOLD) / ZERO_THRESHOLD
+    np.multiply(final_angle_data, decay_factor, out=final_angle_data)
 
     # --- 3. 消除软阈值导致的局部跳变 (最终平滑修复) ---
     final_window_len = FINAL_SMOOTH_WINDOW
     if final_window_len % 2 == 0: final_window_len -= 1
     if final_window_len < 3: final_window_len = 3
     
-    final_angle_data = pd.Series(final_angle_data).rolling(
-        window=final_window_len, 
-        center=True, 
-        min_periods=1
-    ).mean().values
+    # 居中滑动平均走 scipy 的 C 实现，免去构建 pandas Series 的开销；
+    # mode='nearest' 用边界值延拓，效果接近 rolling 的 min_periods=1
+    final_angle_data = uniform_filter1d(final_angle_data, size=final_window_len, mode='nearest')
     
     
     # --- 4a. 起步区：角度从0开始逐渐增加 ---
@@ -93,14 +105,17 @@ def start_mock(output_filename='driving_data_final_version_speed_to_zero.csv'):
     # --- 5. 生成速度数据 (与角度关联，并应用步长) ---
 
     # 5.1 基础速度计算（浮点数）
-    normalized_angle_abs = np.abs(final_angle_data) / MAX_ANGLE
-    straightness_factor = (1 - normalized_angle_abs)
-
-    # 速度范围现在是从 MIN_SPEED_TARGET (0) 到 MAX_SPEED
+    # 速度范围现在是从 MIN_SPEED_TARGET (0) 到 MAX_SPEED。
+    # MIN + range*(1-|a|/MAX) + noise == MAX - (range/MAX)*|a| + noise，
+    # 就地 ufunc 链只分配一个数组，少了 4 个临时数组的内存往返
     speed_range = MAX_SPEED - MIN_SPEED_TARGET
-    raw_speed_data = MIN_SPEED_TARGET + speed_range * straightness_factor
-    speed_noise = np.random.normal(0, 50, DATA_POINTS)
-    speed_data_float = raw_speed_data + speed_noise
+    speed_noise = np.empty(DATA_POINTS)
+    rng.standard_normal(out=speed_noise)  # 直接填充预分配缓冲
+    speed_noise *= 50
+    speed_data_float = np.abs(final_angle_data)
+    speed_data_float *= -(speed_range / MAX_ANGLE)
+    speed_data_float += MAX_SPEED
+    speed_data_float += speed_noise
 
     # 5.2 处理起步区：速度从 0 平稳上升
     if START_POINTS > 0:
@@ -116,19 +131,22 @@ def start_mock(output_filename='driving_data_final_version_speed_to_zero.csv'):
     speed_decay_factor = np.linspace(last_speed_before_stop, MIN_SPEED_TARGET, STOP_POINTS)
     speed_data_float[STOP_START_INDEX:] = speed_decay_factor
 
-    # 5.4 应用步长
-    final_speed_data = np.round(speed_data_float / SPEED_STEP) * SPEED_STEP
+    # 5.4 应用步长: 乘倒数替代除法，就地 rint/乘回/限幅，少两次数组分配
+    speed_data_float *= 1.0 / SPEED_STEP
+    np.rint(speed_data_float, out=speed_data_float)
+    speed_data_float *= SPEED_STEP
 
     # 5.5 最终限制速度范围并转换为整数，确保速度不低于 0
-    final_speed_data = np.clip(final_speed_data, MIN_SPEED_TARGET, MAX_SPEED).astype(int)
+    np.clip(speed_data_float, MIN_SPEED_TARGET, MAX_SPEED, out=speed_data_float)
+    final_speed_data = speed_data_float.astype(int)
     
     # --- 6. 整合数据并输出到CSV文件 ---
-    output_df = pd.DataFrame({
-        'speed': final_speed_data,
-        'angle': np.round(final_angle_data, 2), 
-    })
-
-    output_df.to_csv(output_filename, index=False)
+    # 两列定长格式直接走 np.savetxt 的 C 级格式化，
+    # 绕开 pandas 逐单元格的格式分发
+    final_angle_rounded = np.round(final_angle_data, 2)
+    np.savetxt(output_filename,
+               np.column_stack([final_speed_data, final_angle_rounded]),
+               fmt=['%d', '%.2f'], delimiter=',', header='speed,angle', comments='')
 
     # --- 7. 打印结果信息 ---
     print(f"成功生成 {DATA_POINTS} 行模拟行车数据并保存到 {output_filename}")
@@ -138,12 +156,12 @@ def start_mock(output_filename='driving_data_final_version_speed_to_zero.csv'):
     print(f"起步区: 前 {START_POINTS} 行 ({START_PERCENTAGE*100:.0f}%) - 速度从 0 平滑加速")
     print(f"停止区: 后 {STOP_POINTS} 行 ({STOP_PERCENTAGE*100:.0f}%) - 速度平滑减速到 0")
     print("-" * 50)
-    print(f"实际速度值的唯一列表: {np.sort(output_df['speed'].unique())}")
-    print(f"速度范围: {output_df['speed'].min()} - {output_df['speed'].max()} mm/s")
-    print(f"起步区速度: {output_df['speed'][:START_POINTS].min()} - {output_df['speed'][:START_POINTS].max()} mm/s")
-    zero_angle_count = (output_df['angle'] == 0).sum()
+    print(f"实际速度值的唯一列表: {np.unique(final_speed_data)}")
+    print(f"速度范围: {final_speed_data.min()} - {final_speed_data.max()} mm/s")
+    print(f"起步区速度: {final_speed_data[:START_POINTS].min()} - {final_speed_data[:START_POINTS].max()} mm/s")
+    zero_angle_count = (final_angle_rounded == 0).sum()
     print(f"角度为 0.00 的数量: {zero_angle_count} (占总数的 {zero_angle_count / DATA_POINTS * 100:.2f}%)")
-    print(f"角度范围: {output_df['angle'].min():.2f} - {output_df['angle'].max():.2f} 度")
+    print(f"角度范围: {final_angle_rounded.min():.2f} - {final_angle_rounded.max():.2f} 度")
 
 if __name__ == "__main__":
     start_mock()
\ No newline at end of file
@@ -1,6 +1,18 @@
-import struct
 import math
 
+import numpy as np
+
+# numba 可选: 有则批量解析走并行 JIT 内核，无则用 NumPy 向量化
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# 档位名称查表和角度换算因子提升到模块级，
+# 免去每次解析重建 dict 和重算 math.pi / 180.0 / 100.0
+_GEAR_NAMES = ("disable", "P (Parking)", "R (Reverse)", "N (Neutral)", "D (Drive)")
+_DEG_TO_RAD_CENTI = math.pi / 18000.0  # 0.01 度/bit -> 弧度，合并 *0.01 和 *pi/180
+
 def parse_vehicle_control_data(data: bytes) -> dict:
     """
     根据提供的非标准位域交叉逻辑，解析FR_mini的控制指令数据。
@@ -19,52 +31,46 @@ def parse_vehicle_control_data(data: bytes) -> dict:
     # 0. 解析档位 (data[0]的低4位)
     # -----------------------------------------------------------
     gear_raw = data[0] & 0x0F
-    gear_name = {
-        0x00: "disable",
-        0x01: "P (Parking)",
-        0x02: "R (Reverse)",
-        0x03: "N (Neutral)",
-        0x04: "D (Drive)",
-    }.get(gear_raw, "Unknown")
+    gear_name = _GEAR_NAMES[gear_raw] if gear_raw < len(_GEAR_NAMES) else "Unknown"
 
     # 1. 解析速度 (data[0-2], 小端序)
     # 速度值是data[0], data[1], data[2]组成的小端序u32，然后右移4位。
     # 原始单位: mm/s
     # -----------------------------------------------------------
-    # 构建 u32: data[2] data[1] data[0] + 0x00
-    # struct.unpack('<I', data[0:3] + b'\x00') 实现了小端序 u32 的转换
-    speed_raw_u32 = struct.unpack('<I', data[0:3] + b'\x00')[0]
-    
+    # 整个报文按小端序读成一个 u64，后面全部用位移取字段，
+    # 免去 data[0:3] + b'\x00' 的字节拼接和 struct 格式解析
+    v = int.from_bytes(data[:8], 'little')
+
     # 右移4位，移除档位信息，得到16位的速度值 (i16)
     # 注意：虽然是 i16，但在这里我们将其视为一个正整数 (u16)
-    linear_velocity_mms = (speed_raw_u32 & 0x0FFFF0) >> 4
-    
+    linear_velocity_mms = (v >> 4) & 0xFFFF
+
     # 转换为 m/s
     linear_velocity_mps = linear_velocity_mms / 1000.0
 
     # 2. 解析转向角 (data[2-4]的位域交叉重构, 16位补码)
     # 原始单位: 0.01 degree
     # -----------------------------------------------------------
-    
+
     # 提取位域:
     # High Byte: data[4](3:0) | data[3](7:4)
     high_byte = ((data[4] & 0x0F) << 4) | ((data[3] >> 4) & 0x0F)
-    
+
     # Low Byte: data[3](3:0) | data[2](7:4)
     low_byte = ((data[3] & 0x0F) << 4) | ((data[2] >> 4) & 0x0F)
-    
-    # 组合为大端序 16 位整数 (i16)
-    # 将 high_byte 和 low_byte 组合成 2 字节并解析为有符号 i16
-    # struct.unpack('>h', ...): '>'代表大端序，'h'代表 signed short (i16)
-    angle_bytes = struct.pack('BB', high_byte, low_byte)
-    steering_angle_raw = struct.unpack('>h', angle_bytes)[0]
+
+    # 组合为大端序 16 位整数并手动做补码符号扩展，
+    # 替代 struct.pack('BB') + struct.unpack('>h') 的两次分配；
+    # (raw & 0x8000) << 1 在符号位为 1 时等于 0x10000，免去分支
+    steering_angle_raw = (high_byte << 8) | low_byte
+    steering_angle_raw -= (steering_angle_raw & 0x8000) << 1
     
     # 3. 转换转向角单位
     # 0.01度/bit -> degree
     steering_angle_deg = steering_angle_raw * 0.01
-    
-    # degree -> radian: rad = deg * (pi / 180)
-    steering_angle_rad = steering_angle_deg * (math.pi / 180.0)
+
+    # degree -> radian: 0.01度/bit 与 pi/180 合并为一个预计算因子
+    steering_angle_rad = steering_angle_raw * _DEG_TO_RAD_CENTI
 
     return {
         "data_hex": data.hex().upper(),
@@ -77,6 +83,63 @@ def parse_vehicle_control_data(data: bytes) -> dict:
         "steering_angle_rad": steering_angle_rad,
     }
 
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _parse_batch(buf, gear, speed, angle_raw):
+        for i in prange(buf.shape[0]):
+            b0 = buf[i, 0]
+            b1 = buf[i, 1]
+            b2 = buf[i, 2]
+            b3 = buf[i, 3]
+            b4 = buf[i, 4]
+            gear[i] = b0 & 0x0F
+            speed[i] = ((b2 & 0x0F) << 12) | (b1 << 4) | (b0 >> 4)
+            raw = (((b4 & 0x0F) << 4) | (b3 >> 4)) << 8
+            raw |= ((b3 & 0x0F) << 4) | (b2 >> 4)
+            # 无分支符号扩展，混合正负角度时不再有分支预测失败
+            angle_raw[i] = raw - ((raw & 0x8000) << 1)
+
+    # 导入时预热，把编译开销移出首个真实批次
+    _parse_batch(np.zeros((1, 8), np.uint8), np.empty(1, np.uint8),
+                 np.empty(1, np.int32), np.empty(1, np.int32))
+else:
+    _parse_batch = None
+
+
+def parse_vehicle_control_batch(frames: np.ndarray):
+    """
+    parse_vehicle_control_data 的批量版本: 一次解析 (N, 8) 的 uint8 报文数组。
+
+    返回 (gear, linear_velocity_mms, steering_angle_raw) 三个数组 (SoA 布局)，
+    省去逐帧的 PyLong 装箱；角度换算成弧度可在结果上做一次
+    angle_raw * (math.pi / 180.0 / 100.0) 的向量化后处理。
+    安装了 numba 时走并行 JIT 内核。
+    """
+    n = frames.shape[0]
+    if _parse_batch is not None:
+        gear = np.empty(n, np.uint8)
+        speed = np.empty(n, np.int32)
+        angle_raw = np.empty(n, np.int32)
+        _parse_batch(frames, gear, speed, angle_raw)
+        return gear, speed, angle_raw
+
+    # NumPy 回退: 对各列做向量化位运算
+    b0 = frames[:, 0].astype(np.int32)
+    b1 = frames[:, 1].astype(np.int32)
+    b2 = frames[:, 2].astype(np.int32)
+    b3 = frames[:, 3].astype(np.int32)
+    b4 = frames[:, 4].astype(np.int32)
+
+    gear = (frames[:, 0] & 0x0F)
+    speed = ((b2 & 0x0F) << 12) | (b1 << 4) | (b0 >> 4)
+
+    high_byte = ((b4 & 0x0F) << 4) | (b3 >> 4)
+    low_byte = ((b3 & 0x0F) << 4) | (b2 >> 4)
+    angle_raw = (high_byte << 8) | low_byte
+    angle_raw -= (angle_raw & 0x8000) << 1  # 无分支符号扩展，免去掩码 scatter
+    return gear, speed, angle_raw
+
+
 # 待解析数据
 # hex_data = "044B00640000002B"
 # hex_data = "84BB10FA0F0000DA"
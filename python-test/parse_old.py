@@ -1,40 +1,63 @@
 import csv
+import re
 import struct
-from typing import Dict
+from typing import NamedTuple
+
+import numpy as np
 
 # --- 核心解析函数 (与之前相同) ---
 
+
+class ControlData(NamedTuple):
+    """parse_control_data_4byte 的解析结果。
+
+    NamedTuple 的分配比字典便宜 (无键哈希)，字段名保持可读，
+    调用方也可以直接解包成两个变量。
+    """
+    linear_velocity_mms: int
+    steering_angle_deg: float
+
+# 预编译的格式对象: 免去每次调用重新解析格式串，且一次解包两个 i16
+_S_HH = struct.Struct('>hh')
+
+# 原始转向角 → 度的换算除数: 除以 1000 并反转正负号一步完成
+# (用负除数而不是乘以倒数，保证数值与原先逐位一致)
+_ANGLE_DIVISOR = -1000.0
+
+# 合法的 4 字节十六进制列: 4 组两位十六进制数，组间允许空格
+# (与 bytes.fromhex 的容忍度一致)。预先用它筛掉坏行，
+# 热循环就不用再给每行搭 try/except 的异常帧
+_HEX4_RE = re.compile(rb'\A *(?:[0-9A-Fa-f]{2} *){4}\Z')
+
 def hex_string_to_bytes(hex_str: str) -> bytes:
     """
     将十六进制字符串 (可能包含空格) 转换为 bytes 对象。
     例如: "0B B8 FF 07" -> b'\x0B\xB8\xFF\x07'
     """
-    cleaned_hex = hex_str.replace(" ", "")
-    if len(cleaned_hex) != 8:
-        raise ValueError(f"十六进制字符串必须代表 4 字节 (8 个字符)，但收到 {len(cleaned_hex)} 个字符。")
-        
-    return bytes.fromhex(cleaned_hex)
+    # bytes.fromhex 本身就容忍空格，不必先做 replace 的字符串拷贝
+    data = bytes.fromhex(hex_str)
+    if len(data) != 4:
+        raise ValueError(f"十六进制字符串必须代表 4 字节 (8 个字符)，但收到 {len(data)} 字节。")
 
+    return data
 
-def parse_control_data_4byte(hex_data: bytes) -> Dict[str, float]:
+
+def parse_control_data_4byte(hex_data: bytes) -> ControlData:
     """
-    解析 4 字节的二进制数据，返回速度 (mm/s) 和转向角 (度) 的字典。
+    解析 4 字节的二进制数据，返回速度 (mm/s) 和转向角 (度)。
     """
     if len(hex_data) != 4:
         raise ValueError(f"二进制数据长度必须是 4 字节，但收到了 {len(hex_data)} 字节。")
 
-    # '>h' = Big-Endian (大端序) signed short (i16)
-    linear_velocity_mms, = struct.unpack('>h', hex_data[0:2])
-    steering_angle_raw, = struct.unpack('>h', hex_data[2:4])
+    # '>hh' = Big-Endian (大端序) signed short (i16) x2，
+    # 一次调用解出两个字段，不再做两次切片 + 两次 unpack
+    linear_velocity_mms, steering_angle_raw = _S_HH.unpack(hex_data)
 
     # 转向角本身就是角度值（单位：0.01度），需要除以100转换为度
     # 同时反转正负号（原始数据的正负与实际转向方向相反）
-    steering_angle_deg = -(steering_angle_raw / 1000.0)
+    steering_angle_deg = steering_angle_raw / _ANGLE_DIVISOR
 
-    return {
-        "linear_velocity_mms": linear_velocity_mms,
-        "steering_angle_deg": steering_angle_deg,
-    }
+    return ControlData(linear_velocity_mms, steering_angle_deg)
 
 
 
@@ -54,62 +77,85 @@ def read_and_parse_csv_by_index(input_file_path: str, output_file_path: str, hex
     # 因为是追加，所以它们位于原始数据的长度之后
     parsed_speed_col_index = hex_column_index + 1
     parsed_angle_deg_col_index = hex_column_index + 2
-    
-    with open(input_file_path, 'r', newline='', encoding='utf-8') as infile, \
-         open(output_file_path, 'w', newline='', encoding='utf-8') as outfile:
-        
-        reader = csv.reader(infile)
-        writer = csv.writer(outfile)
-        
-        # 写入标题行
-        try:
-            header = next(reader)
-            # 假设原始数据有 N 列，新的标题行为 N+2 列
-            new_header = header + ['Parsed_Speed_mm_s', 'Parsed_Steering_Deg']
-            writer.writerow(new_header)
-        except StopIteration:
-            # 文件为空，直接返回
-            return
-        
-        # 循环处理数据行
-        for row_number, row in enumerate(reader, start=2): # 从第 2 行开始计数
-            
-            # 创建一个可修改的新行，初始值为原行数据
-            new_row = list(row)
-            
-            # 初始化新的两列数据 (None 或空字符串，方便写入)
-            velocity_mms = None
-            angle_deg = None
-            
-            if len(row) > hex_column_index:
-                # 获取指定列的十六进制字符串
-                hex_str = row[hex_column_index].strip()
-                
-                try:
-                    # 1. 转换为 bytes 并解析
-                    data_bytes = hex_string_to_bytes(hex_str)
-                    parsed_data = parse_control_data_4byte(data_bytes)
-
-                    velocity_mms = parsed_data['linear_velocity_mms']
-
-                    # 2. 直接获取角度（已经是度数，且正负已反转）
-                    angle_deg = parsed_data['steering_angle_deg']
 
+    # CAN 日志是规整的 CSV (没有引号和内嵌逗号/换行)，整个文件一次读入
+    # 后直接按字节切分，跳过 csv 模块逐字符的状态机和每行的列表构建
+    with open(input_file_path, 'rb') as infile:
+        data = infile.read()
+
+    lines = data.split(b'\n')
+    if lines and lines[-1] == b'':
+        lines.pop()  # 末尾换行产生的空行
+    if not lines:
+        # 文件为空，直接返回
+        return
+
+    header = lines[0].rstrip(b'\r')
+    body = lines[1:]
+
+    # 1. 逐行只做 fromhex (C 实现) 并收集原始字节；
+    #    数值解包、换算和格式化整批交给 NumPy，免去每行两次 struct.unpack
+    raw_chunks = []
+    valid = np.zeros(len(body), dtype=bool)
+
+    match_hex4 = _HEX4_RE.match
+    for row_number, line in enumerate(body, start=2): # 从第 2 行开始计数
+        fields = line.rstrip(b'\r').split(b',') if line.rstrip(b'\r') else []
+        if len(fields) > hex_column_index:
+            field = fields[hex_column_index]
+            if match_hex4(field):
+                # 热路径: 正则已保证 fromhex 必然成功且恰为 4 字节，
+                # 不需要异常保护
+                raw_chunks.append(bytes.fromhex(field.decode('ascii')))
+                valid[row_number - 2] = True
+            else:
+                # 冷路径: 走原有的异常诊断，保持一致的警告输出
+                hex_str = field.strip().decode('utf-8')
+                try:
+                    raw_chunks.append(hex_string_to_bytes(hex_str))
+                    valid[row_number - 2] = True
                 except ValueError as e:
                     # 解析错误，保留 None/NaN 或打印警告
                     print(f"警告: 第 {row_number} 行数据 '{hex_str}' 解析错误: {e}. 结果将设置为 'NaN'。")
                 except Exception as e:
                     print(f"警告: 第 {row_number} 行未知错误: {e}. 结果将设置为 'NaN'。")
+        else:
+            print(f"警告: 第 {row_number} 行的列数不足 ({len(fields)} 列)，无法读取索引 {hex_column_index} 的数据。")
+
+    # 2. 一次 frombuffer 把所有有效行解包成大端 i16 的 (速度, 角度) 对，
+    #    换算和格式化都是向量化的 C 循环，astype('S') 直接给出字节串列
+    if raw_chunks:
+        arr = np.frombuffer(b''.join(raw_chunks), dtype='>i2').reshape(-1, 2)
+        speed_str = np.char.mod('%d', arr[:, 0]).astype('S')
+        # 转向角除以 1000 并反转正负号（原始数据的正负与实际转向方向相反）
+        angle_str = np.char.mod('%.3f', arr[:, 1] / _ANGLE_DIVISOR).astype('S')
+        # 整个追加列 ',速度,角度\r\n' 也向量化拼好，
+        # 输出循环里每行只剩一次拼接
+        suffix = np.char.add(
+            np.char.add(np.char.add(b',', speed_str), b','),
+            np.char.add(angle_str, b'\r\n'))
+
+    # 3. 按原顺序拼回输出行，无效行填 'NaN'；输出攒在 bytearray 里，
+    #    到 1 MB 才真正写一次文件；文件本身也配 1 MB 缓冲，
+    #    让末尾不足一块的残余写入同样只占一次系统调用
+    with open(output_file_path, 'wb', buffering=1 << 20) as outfile:
+        out = bytearray()
+        out += header + b',Parsed_Speed_mm_s,Parsed_Steering_Deg\r\n'
+
+        parsed_pos = 0
+        for i, line in enumerate(body):
+            line = line.rstrip(b'\r')
+            if valid[i]:
+                out += line + suffix[parsed_pos]
+                parsed_pos += 1
+            elif line:
+                out += line + b',NaN,NaN\r\n'
             else:
-                print(f"警告: 第 {row_number} 行的列数不足 ({len(row)} 列)，无法读取索引 {hex_column_index} 的数据。")
-
-            # 3. 将解析结果追加到新行末尾
-            # Python 的 csv.writer 会将 None 写入空字符串，但我们这里直接使用解析值或 'NaN' 字符串
-            new_row.append(f"{velocity_mms}" if velocity_mms is not None else 'NaN')
-            new_row.append(f"{angle_deg:.3f}" if angle_deg is not None else 'NaN')
-            
-            # 4. 写入输出文件
-            writer.writerow(new_row)
+                out += b'NaN,NaN\r\n'
+            if len(out) >= (1 << 20):
+                outfile.write(out)
+                out.clear()
+        outfile.write(out)
 
     print(f"\n✅ 数据处理完成。新数据已保存到: {output_file_path}")
     print(f"   车速 (mm/s) 保存在新文件的第 {parsed_speed_col_index + 1} 列。")
@@ -4,6 +4,104 @@ import binascii
 import argparse
 import sys
 
+# 打印原始帧字节的调试开关: 关闭后不再为每帧构建十六进制字符串
+DEBUG = False
+
+# 每帧摘要 ("Receive CAN id: ...") 的打印开关: 吞吐量测试时关掉，
+# 解析循环就不再被 stdout 的逐帧系统调用拖慢
+VERBOSE = True
+
+# numba 可选: 有则帧扫描走 JIT 内核 (逐字节状态机最不适合解释器执行)，
+# 无则用下面的纯 Python parse_frames
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    import numpy as np
+
+    @njit(cache=True)
+    def _scan_frames(buf, ids, dlcs, flags, starts):
+        """扫描 uint8 缓冲，把完整帧的 ID/DLC/标志/载荷偏移写入预分配数组。
+
+        返回 (帧数, 新游标)。flags: bit0=扩展帧, bit1=远程帧, bit2=结束码错误。
+        """
+        pos = 0
+        count = 0
+        n = buf.size
+        cap = ids.size
+        while n - pos >= 2 and count < cap:
+            if buf[pos] != 0xAA:
+                pos += 1
+                continue
+            ctrl = buf[pos + 1]
+            if ctrl & 0xC0 != 0xC0:
+                pos += 1
+                continue
+            dlc = ctrl & 0x0F
+            ext = (ctrl >> 5) & 1
+            remote = (ctrl >> 4) & 1
+            len2 = dlc + 5 if ext else dlc + 3
+            if n - pos < 2 + len2:
+                break
+            id_len = 4 if ext else 2
+            can_id = 0
+            for k in range(id_len - 1, -1, -1):  # ID 低字节在前
+                can_id = (can_id << 8) | int(buf[pos + 2 + k])
+            end_err = 0 if buf[pos + 1 + len2] == 0x55 else 1
+            ids[count] = can_id
+            dlcs[count] = dlc
+            flags[count] = ext | (remote << 1) | (end_err << 2)
+            starts[count] = pos + 2 + id_len
+            count += 1
+            pos += 2 + len2
+        return count, pos
+
+    # 导入时预热，把编译开销移出首个真实批次
+    _scan_frames(np.zeros(1, np.uint8), np.empty(1, np.int64),
+                 np.empty(1, np.uint8), np.empty(1, np.uint8),
+                 np.empty(1, np.int64))
+else:
+    _scan_frames = None
+
+
+def calculate_checksum(data):
+    ##    Check Summing
+    # memoryview 切片不拷贝底层字节，省去每次求和前的 O(N) 复制
+    checksum = sum(memoryview(data)[2:])
+    return checksum & 0xff
+
+
+#Set the CAN speed section, in this example set to 500kbps, using a variable length transceiver
+# 配置命令是常量，校验和 (sum(data[2:]) & 0xff = 0x17) 预先算好直接
+# 写成字节串，省去每次启动时的列表构建和求和
+set_can_baudrate = bytes([
+    0xaa,     #  0  Packet header
+    0x55,     #  1  Packet header
+    0x12,     #  3 Type: use variable protocol to send and receive data##  0x02- Setting (using fixed 20 byte protocol to send and receive data),   0x12- Setting (using variable protocol to send and receive data)##
+    0x03,     #  3 CAN Baud Rate:  500kbps  ##  0x01(1Mbps),  0x02(800kbps),  0x03(500kbps),  0x04(400kbps),  0x05(250kbps),  0x06(200kbps),  0x07(125kbps),  0x08(100kbps),  0x09(50kbps),  0x0a(20kbps),  0x0b(10kbps),   0x0c(5kbps)##
+    0x02,     #  4  Frame Type: Extended Frame  ##   0x01 standard frame,   0x02 extended frame ##
+    0x00,     #  5  Filter ID1
+    0x00,     #  6  Filter ID2
+    0x00,     #  7  Filter ID3
+    0x00,     #  8  Filter ID4
+    0x00,     #  9  Mask ID1
+    0x00,     #  10 Mask ID2
+    0x00,     #  11 Mask ID3
+    0x00,     #  12 Mask ID4
+    0x00,     #  13 CAN mode:  normal mode  ##   0x00 normal mode,   0x01 silent mode,   0x02 loopback mode,   0x03 loopback silent mode ##
+    0x00,     #  14 automatic resend:  automatic retransmission
+    0x00,     #  15 Spare
+    0x00,     #  16 Spare
+    0x00,     #  17 Spare
+    0x00,     #  18 Spare
+    0x17,     #  19 Checksum (预计算)
+])
+
+# 防止修改配置字段后忘记更新预计算的校验和
+assert calculate_checksum(set_can_baudrate[:-1]) == set_can_baudrate[-1]
+
 
 def parse_arguments():
     """Parse command line arguments for serial port configuration."""
@@ -28,103 +126,150 @@ def main():
 
     # Initialize serial connection with user-provided parameters
     try:
-        ser = serial.Serial(args.port, args.baudrate)
+        # 带超时的阻塞读: 无数据时由内核唤醒，不空转 CPU，
+        # 超时返回让 Ctrl+C 仍能及时退出
+        ser = serial.Serial(args.port, args.baudrate, timeout=0.05)
         print(f"Connected to {ser.portstr} at {args.baudrate} baud")
     except serial.SerialException as e:
         print(f"Error opening serial port {args.port}: {e}")
         sys.exit(1)
 
-
-    def calculate_checksum(data):
-        ##    Check Summing
-        checksum = sum(data[2:])
-        return checksum & 0xff
-
-    #Set the CAN speed section, in this example set to 500kbps, using a variable length transceiver
-    set_can_baudrate = [
-        0xaa,     #  0  Packet header
-        0x55,     #  1  Packet header
-        0x12,     #  3 Type: use variable protocol to send and receive data##  0x02- Setting (using fixed 20 byte protocol to send and receive data),   0x12- Setting (using variable protocol to send and receive data)##
-        0x03,     #  3 CAN Baud Rate:  500kbps  ##  0x01(1Mbps),  0x02(800kbps),  0x03(500kbps),  0x04(400kbps),  0x05(250kbps),  0x06(200kbps),  0x07(125kbps),  0x08(100kbps),  0x09(50kbps),  0x0a(20kbps),  0x0b(10kbps),   0x0c(5kbps)##
-        0x02,     #  4  Frame Type: Extended Frame  ##   0x01 standard frame,   0x02 extended frame ##
-        0x00,     #  5  Filter ID1
-        0x00,     #  6  Filter ID2
-        0x00,     #  7  Filter ID3
-        0x00,     #  8  Filter ID4
-        0x00,     #  9  Mask ID1
-        0x00,     #  10 Mask ID2
-        0x00,     #  11 Mask ID3
-        0x00,     #  12 Mask ID4
-        0x00,     #  13 CAN mode:  normal mode  ##   0x00 normal mode,   0x01 silent mode,   0x02 loopback mode,   0x03 loopback silent mode ##
-        0x00,     #  14 automatic resend:  automatic retransmission
-        0x00,     #  15 Spare
-        0x00,     #  16 Spare
-        0x00,     #  17 Spare
-        0x00,     #  18 Spare
-    ]
-
-    #Calculate the checksum
-    checksum = calculate_checksum(set_can_baudrate)
-    set_can_baudrate.append(checksum)
-    set_can_baudrate = bytes(set_can_baudrate)
-
     #Send command to set CAN baud rate
     ser.write(set_can_baudrate)
     print("CAN baud rate setting command sent.")
 
 
-    # Read data from serial port
-    try:
-        while True:
-            data = ser.read(2)
-            hex_data1 = [hex(byte) for byte in data]
-            if (data[0] == 0xaa) and (data[1] & 0xc0 == 0xc0):  # frame header
-                len = data[1] & 0x0f
-                if data[1] & 0x10 == 0x00:
-                    strFrameFormat = "Data Frame"
-                else:
-                    strFrameFormat = "Remote Frame"
+    def parse_frames(buffer, pos):
+        """从 pos 开始解析缓冲中所有完整的变长协议帧，返回新的游标位置。
 
-                if data[1] & 0x20 == 0x00:
-                    strFrameType = "Standard Frame"
-                    len2 = len + 3
-                else:
-                    strFrameType = "Extended Frame"
-                    len2 = len + 5
-
-                data2 = ser.read(len2)
-                hex_data = [hex(byte) for byte in data2]
-                hex_data1 += hex_data
-                print(hex_data1)
-                if data2[len2 - 1] == 0x55:  # end code
-                    if strFrameType == "Standard Frame":
-                        id = data2[1]
-                        id <<= 8
-                        id += data2[0]
-                        strId = hex(id)
-
-                        if len > 0:
-                            CanData = hex_data[2:2 + len]
-                        else:
-                            CanData = ["No Data"]
+        帧首不匹配时游标只前移一个字节重新同步；数据不足一整帧时停止，
+        等主循环补充更多字节。
+        """
+        n = len(buffer)
+        # memoryview 切片零拷贝，不再为每帧分配一段 bytearray；
+        # 视图只在本函数内存活，返回后缓冲即可安全压缩
+        mv = memoryview(buffer)
+        while n - pos >= 2:
+            if buffer[pos] != 0xaa:
+                # C 级 find (memchr) 跳过垃圾字节找下一个帧头候选，
+                # 比逐字节 pos += 1 的 Python 循环快一个数量级
+                idx = buffer.find(0xaa, pos + 1)
+                if idx < 0:
+                    pos = n  # 整段没有帧头，全部可丢弃
+                    break
+                pos = idx
+                if n - pos < 2:
+                    break
+            ctrl = buffer[pos + 1]
+            if (ctrl & 0xc0) != 0xc0:  # frame header
+                pos += 1
+                continue
+
+            data_len = ctrl & 0x0f
+            if ctrl & 0x10 == 0x00:
+                strFrameFormat = "Data Frame"
+            else:
+                strFrameFormat = "Remote Frame"
+
+            if ctrl & 0x20 == 0x00:
+                strFrameType = "Standard Frame"
+                len2 = data_len + 3
+            else:
+                strFrameType = "Extended Frame"
+                len2 = data_len + 5
+
+            if n - pos < 2 + len2:
+                break  # 帧还没收全
+
+            data2 = mv[pos + 2:pos + 2 + len2]
+            if DEBUG:
+                # 一次 C 级 hex() 转换整帧，不再逐字节构建字符串列表
+                print(bytes((buffer[pos], ctrl)).hex(' ') + ' ' + data2.hex(' '))
+            if data2[len2 - 1] == 0x55:  # end code
+                if strFrameType == "Standard Frame":
+                    # ID 低字节在前: 一次 C 级解码替代逐字节移位累加
+                    id = int.from_bytes(data2[0:2], 'little')
+                    strId = hex(id)
+
+                    if data_len > 0:
+                        CanData = data2[2:2 + data_len].hex(' ')
                     else:
-                        id = data2[3]
-                        id <<= 8
-                        id += data2[2]
-                        id <<= 8
-                        id += data2[1]
-                        id <<= 8
-                        id += data2[0]
-                        strId = hex(id)
-                        if len > 0:
-                            CanData = hex_data[4:4 + len]
-                        else:
-                            CanData = ["No Data"]
-                    print("Receive CAN id: " + strId + " Data:", end='')
-                    print(CanData)
-                    print(strFrameType + ", " + strFrameFormat)
+                        CanData = "No Data"
                 else:
+                    id = int.from_bytes(data2[0:4], 'little')
+                    strId = hex(id)
+                    if data_len > 0:
+                        CanData = data2[4:4 + data_len].hex(' ')
+                    else:
+                        CanData = "No Data"
+                if VERBOSE:
+                    # 三行摘要合成一次 print，每帧只过一次 stdout 锁
+                    print("Receive CAN id: " + strId + " Data:" + CanData
+                          + "\n" + strFrameType + ", " + strFrameFormat)
+            else:
+                print("Receive Packet header Error")
+            pos += 2 + len2
+        return pos
+
+    if _scan_frames is not None:
+        # JIT 路径的预分配输出数组，批内帧数超过容量时剩余帧留到下一轮
+        _ids = np.empty(256, np.int64)
+        _dlcs = np.empty(256, np.uint8)
+        _flags = np.empty(256, np.uint8)
+        _starts = np.empty(256, np.int64)
+
+        def parse_frames_jit(buffer, pos):
+            """同 parse_frames，但逐字节扫描在编译内核里完成，
+            Python 层只负责把结果打印出来。"""
+            mv = memoryview(buffer)[pos:]
+            arr = np.frombuffer(mv, np.uint8)
+            count, consumed = _scan_frames(arr, _ids, _dlcs, _flags, _starts)
+            for k in range(count):
+                f = _flags[k]
+                if f & 4:
                     print("Receive Packet header Error")
+                    continue
+                if not VERBOSE:
+                    continue
+                strId = hex(int(_ids[k]))
+                dlc = _dlcs[k]
+                start = _starts[k]
+                if dlc > 0:
+                    CanData = mv[start:start + dlc].hex(' ')
+                else:
+                    CanData = "No Data"
+                print("Receive CAN id: " + strId + " Data:" + CanData + "\n"
+                      + ("Extended Frame" if f & 1 else "Standard Frame") + ", "
+                      + ("Data Frame" if not f & 2 else "Remote Frame"))
+            # 释放视图，否则 del buffer[:read_pos] 压缩会报 BufferError
+            del arr
+            mv.release()
+            return pos + consumed
+
+        # DEBUG 需要逐帧原始字节，走纯 Python 路径
+        if not DEBUG:
+            parse_frames = parse_frames_jit
+
+    # Read data from serial port: 整批读入缓冲，在缓冲上原地解析，
+    # 不再每帧做 2 次 read 系统调用
+    buffer = bytearray()
+    read_pos = 0
+    COMPACT_THRESHOLD = 4096  # 已消费区间攒到该值才压缩一次缓冲
+    try:
+        while True:
+            # 阻塞等首字节，到达后把已排队的尾巴一次取完；
+            # 分两次 += 直接扩展缓冲，不再拼一个临时 bytes
+            head = ser.read(1)
+            if head:
+                buffer += head
+                pending = ser.in_waiting
+                if pending:
+                    buffer += ser.read(pending)
+            read_pos = parse_frames(buffer, read_pos)
+            # 压缩是 O(n) 的 memmove，推迟到阈值处做一次以摊薄成本
+            if read_pos > COMPACT_THRESHOLD:
+                del buffer[:read_pos]
+                read_pos = 0
     except KeyboardInterrupt:
         print("\nReceiver stopped by user")
     finally:
@@ -1,6 +1,9 @@
 import struct
 import math
 
+# 预编译的格式对象: 免去每次调用重新解析格式串
+_S_Q_LE = struct.Struct('<Q')
+
 def build_vehicle_control_data(gear: int, linear_velocity_mms: int, steering_angle_raw: int, alive_counter: int = 0) -> str:
     """
     根据提供的非标准位域交叉逻辑，反向构建FR_mini的控制指令数据报文。
@@ -15,55 +18,23 @@ def build_vehicle_control_data(gear: int, linear_velocity_mms: int, steering_ang
         str: 8字节的CAN数据报文十六进制字符串，字节间用空格分隔。
     """
     
-    # --- 1. 组合 data[0], data[1], data[2] (档位和速度) ---
-    # 原始 u32 = (速度值 << 4) | 档位值
-    speed_shifted = linear_velocity_mms << 4
-    raw_u32 = speed_shifted | (gear & 0x0F)
-    
-    # 转换为 4 字节的小端序，只取前 3 字节
-    raw_bytes = struct.pack('<I', raw_u32)
-    data0 = raw_bytes[0]
-    data1 = raw_bytes[1]
-    data2 = raw_bytes[2]
-    
-    # --- 2. 组合 data[2], data[3], data[4] (转向角) ---
-    # 转向角 (steering_angle_raw) 是一个 i16，需要分解为 high_byte 和 low_byte
-    angle_bytes = struct.pack('>h', steering_angle_raw)
-    high_byte = angle_bytes[0]
-    low_byte = angle_bytes[1]
-    
-    # 逆向重构 data[2], data[3], data[4] 的位域
-    
-    # 重构 data[4] (data[4]的低4位是 high_byte 的高4位)
-    data4 = (high_byte >> 4) & 0x0F
-    
-    # 重构 data[3] (data[3]的高4位是 high_byte 的低4位，低4位是 low_byte 的高4位)
-    data3 = ((high_byte & 0x0F) << 4) | (low_byte >> 4)
-    
-    # 重构 data[2] (data[2]的高4位是 low_byte 的低4位)，与步骤 1 的 data[2] 进行或操作
-    data2 = data2 | ((low_byte & 0x0F) << 4)
-    
-    # --- 3. 填充 data[5] 和 data[6] ---
-    data5 = 0x00  # Target Vehicle Braking (假设 0x00 为无制动)
-    data6 = alive_counter & 0xFF  # Alive Rolling Counter
-    
-    # --- 4. 组合前 7 字节并计算校验和 (BCC) ---
-    payload = [data0, data1, data2, data3, data4, data5, data6]
-    
-    # 计算 BCC (异或校验)
-    bcc = 0
-    for byte in payload:
-        bcc ^= byte
-    
-    data7 = bcc
-    
-    # --- 5. 组合成最终的 8 字节报文 ---
-    final_data = bytes(payload + [data7])
-    
-    # 转换为十六进制字符串，并用空格分隔
-    hex_string_spaced = ' '.join([f'{b:02X}' for b in final_data])
-    
-    return hex_string_spaced
+    # 把整个报文当成一个小端 u64 来拼: data[0..2] 是 (速度 << 4) | 档位
+    # 的低 3 字节；转向角 (i16 补码) 的 16 个位正好连续落在 bit20..35
+    # (data[2] 高 4 位 + data[3] + data[4] 低 4 位)；data[5] 制动恒为 0；
+    # data[6] 是心跳。一次整数运算替代逐字节位域重构
+    word = (((linear_velocity_mms << 4) | (gear & 0x0F)) & 0xFFFFFF) \
+        | ((steering_angle_raw & 0xFFFF) << 20) \
+        | ((alive_counter & 0xFF) << 48)
+
+    # BCC (异或校验): 对 64 位字做折叠异或等价于前 7 字节逐一异或
+    # (data[7] 此时还是 0，不影响结果)
+    x = word ^ (word >> 32)
+    x ^= x >> 16
+    x ^= x >> 8
+    word |= (x & 0xFF) << 56
+
+    # 一次 pack + C 级 hex 格式化，不再经过中间列表和逐字节 f-string
+    return _S_Q_LE.pack(word).hex(' ').upper()
 
 
 
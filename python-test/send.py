@@ -10,11 +10,14 @@ print(t.portstr)
 
 
 def calculate_checksum(data):
-    checksum = sum(data[2:])
+    # memoryview 切片不拷贝底层字节，省去每次求和前的 O(N) 复制
+    checksum = sum(memoryview(data)[2:])
     return checksum & 0xff
 
 
-set_can_baudrate = [
+# 配置命令是常量，校验和 (sum(data[2:]) & 0xff = 0x17) 预先算好直接
+# 写成字节串，省去每次连接时的列表构建和求和
+set_can_baudrate = bytes([
     0xaa,     #  0  Packet header
     0x55,     #  1  Packet header
     0x12,     #  3 Type: use variable protocol to send and receive data##  0x02- Setting (using fixed 20 byte protocol to send and receive data),   0x12- Setting (using variable protocol to send and receive data)##
@@ -34,19 +37,18 @@ set_can_baudrate = [
     0x00,     #  16 Spare
     0x00,     #  17 Spare
     0x00,     #  18 Spare
-]
-
+    0x17,     #  19 Checksum (预计算)
+])
 
+# 防止修改配置字段后忘记更新预计算的校验和
+assert calculate_checksum(set_can_baudrate[:-1]) == set_can_baudrate[-1]
 
-# Calculate checksum
-checksum = calculate_checksum(set_can_baudrate)
-set_can_baudrate.append(checksum)
 print(set_can_baudrate)
-set_can_baudrate = bytes(set_can_baudrate)
 
 # Send command to set CAN baud rate
 
 num_set_baud = t.write(set_can_baudrate)
+t.flush()  # 确保配置命令立即下发，而不是留在驱动缓冲里
 print(f"Set CAN baud rate command sent, bytes written: {num_set_baud}")
 
 time.sleep(1)
@@ -73,5 +75,6 @@ send_can_id_data = bytes([
 ])
 print(send_can_id_data)
 num = t.write(send_can_id_data)
+t.flush()
 print(num)
 t.close()
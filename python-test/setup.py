@@ -0,0 +1,20 @@
+"""
+可选的 AOT 编译脚本: python setup.py build_ext --inplace
+
+把 _convert.py 的位打包核心编译成本地扩展 (优先 mypyc，其次 Cython)。
+两者都未安装、或从未执行过本脚本时，_convert.py 照常以解释方式运行，
+功能完全一致，只是慢一些。
+"""
+from setuptools import setup
+
+try:
+    from mypyc.build import mypycify
+    ext_modules = mypycify(['_convert.py'])
+except ImportError:
+    from Cython.Build import cythonize
+    ext_modules = cythonize(['_convert.py'])
+
+setup(
+    name='usb-can-convert-helpers',
+    ext_modules=ext_modules,
+)
@@ -2,6 +2,9 @@ import math
 import struct
 from parse_old import parse_control_data_4byte
 
+# 预编译的格式对象: 免去每次调用重新解析 '>hh' 格式串
+_S_HH = struct.Struct('>hh')
+
 def generate_control_data_hex(linear_velocity_mms: int, steering_angle_rad: float) -> str:
     """
     根据给定的线速度(mm/s)和转向角(弧度)生成4字节的控制数据，并以十六进制字符串形式返回。
@@ -22,7 +25,7 @@ def generate_control_data_hex(linear_velocity_mms: int, steering_angle_rad: floa
     steering_angle_raw = max(-32768, min(32767, steering_angle_raw))
     
     # 使用大端序打包为4字节
-    data_bytes = struct.pack('>hh', linear_velocity_mms, steering_angle_raw)
+    data_bytes = _S_HH.pack(linear_velocity_mms, steering_angle_raw)
     
     # 转换为十六进制字符串(无空格)
     hex_str = data_bytes.hex().upper()
@@ -35,8 +38,8 @@ def main():
     steering_angle_rad = -0.805
     hex_str = generate_control_data_hex(linear_velocity_mms, steering_angle_rad)
     print(hex_str)
-    res = parse_control_data_4byte(bytes.fromhex(hex_str))
-    print(res)
+    velocity_mms, angle_deg = parse_control_data_4byte(bytes.fromhex(hex_str))
+    print(f"velocity={velocity_mms} mm/s, angle={angle_deg}°")
 
 def deg_to_rad(degrees):
     """